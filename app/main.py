@@ -1,7 +1,7 @@
 import json
 import time
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime
 
 import boto3
@@ -11,6 +11,13 @@ from pydantic import BaseModel
 from datadog import DogStatsdClient
 from ddtrace import tracer
 
+try:
+    from app.semantic_cache import SemanticCache
+    from app.traffic_capture import TrafficCapture, TrafficCaptureMiddleware
+except ImportError:  # started from inside app/ (`uvicorn main:app`)
+    from semantic_cache import SemanticCache
+    from traffic_capture import TrafficCapture, TrafficCaptureMiddleware
+
 
 logger = structlog.get_logger()
 
@@ -26,6 +33,8 @@ class GenerateResponse(BaseModel):
     tokens_used: int
     latency_ms: float
     cost_usd: float
+    cache_hit: bool = False
+    cache_similarity: Optional[float] = None
 
 
 app = FastAPI(
@@ -47,12 +56,57 @@ statsd = DogStatsdClient(
 BEDROCK_MODEL_ID = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-5-sonnet-20241022-v2:0")
 SERVICE_NAME = os.getenv("DD_SERVICE", "my-bedrock-proxy")
 
+# Opt-in near-duplicate cache in front of Bedrock. Entries are scoped per model
+# and max_tokens, and per user_id unless SEMANTIC_CACHE_SCOPE=model.
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_SCOPE = os.getenv("SEMANTIC_CACHE_SCOPE", "user").lower()
+if SEMANTIC_CACHE_SCOPE not in ("user", "model"):
+    # Anything else would silently share cached responses across users
+    raise ValueError(f"SEMANTIC_CACHE_SCOPE must be 'user' or 'model', got {SEMANTIC_CACHE_SCOPE!r}")
+
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+    max_bytes=int(os.getenv("SEMANTIC_CACHE_MAX_MB", "64")) * 1024 * 1024
+) if SEMANTIC_CACHE_ENABLED else None
+
+
+# Opt-in capture of sampled /generate traffic for benchmarks/replay_traffic.py.
+if os.getenv("TRAFFIC_CAPTURE_ENABLED", "false").lower() == "true":
+    traffic_capture = TrafficCapture(
+        path=os.getenv("TRAFFIC_CAPTURE_PATH", "/tmp/genai-guardian/capture.jsonl"),
+        sample_rate=float(os.getenv("TRAFFIC_CAPTURE_SAMPLE_RATE", "1.0")),
+        redact_prompts=os.getenv("TRAFFIC_CAPTURE_REDACT_PROMPTS", "false").lower() == "true",
+        max_bytes=int(os.getenv("TRAFFIC_CAPTURE_MAX_MB", "16")) * 1024 * 1024,
+        backup_count=int(os.getenv("TRAFFIC_CAPTURE_BACKUPS", "5"))
+    )
+    app.add_middleware(TrafficCaptureMiddleware, capture=traffic_capture)
+    app.add_event_handler("shutdown", traffic_capture.close)
+
+
+def cache_scope(request: GenerateRequest) -> tuple:
+    tenant = "" if SEMANTIC_CACHE_SCOPE == "model" else request.user_id
+    return (BEDROCK_MODEL_ID, request.max_tokens, tenant)
+
+
+def estimate_tokens(prompt: str, generated_text: str) -> tuple:
+    # Rough estimation
+    input_tokens = len(prompt.split()) * 1.3
+    output_tokens = len(generated_text.split()) * 1.3
+    return input_tokens, output_tokens
+
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": SERVICE_NAME}
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    if semantic_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **semantic_cache.stats()}
+
+
 @app.post("/generate", response_model=GenerateResponse)
 @tracer.wrap("bedrock.generate")
 async def generate_text(request: GenerateRequest):
@@ -66,6 +120,49 @@ async def generate_text(request: GenerateRequest):
             model=BEDROCK_MODEL_ID
         )
         
+        if semantic_cache is not None:
+            hit = semantic_cache.get(cache_scope(request), request.prompt)
+            cache_tags = [
+                f"model:{BEDROCK_MODEL_ID}",
+                f"service:{SERVICE_NAME}"
+            ]
+            if hit is None:
+                statsd.increment("bedrock.cache.misses", tags=cache_tags)
+            else:
+                latency_ms = (time.time() - start_time) * 1000
+                input_tokens, output_tokens = estimate_tokens(request.prompt, hit.value)
+                
+                statsd.increment(
+                    "bedrock.requests.total",
+                    tags=[
+                        f"model:{BEDROCK_MODEL_ID}",
+                        f"service:{SERVICE_NAME}",
+                        f"user_id:{request.user_id}",
+                        "cache_hit:true"
+                    ]
+                )
+                statsd.increment("bedrock.cache.hits", tags=cache_tags)
+                statsd.histogram("bedrock.cache.similarity", hit.similarity, tags=cache_tags)
+                statsd.histogram("bedrock.cache.latency_ms", latency_ms, tags=cache_tags)
+                
+                logger.info(
+                    "generate_request_cache_hit",
+                    user_id=request.user_id,
+                    latency_ms=latency_ms,
+                    similarity=hit.similarity,
+                    model=BEDROCK_MODEL_ID
+                )
+                
+                # No Bedrock call was made, so there is no cost to report
+                return GenerateResponse(
+                    response=hit.value,
+                    tokens_used=int(input_tokens + output_tokens),
+                    latency_ms=latency_ms,
+                    cost_usd=0.0,
+                    cache_hit=True,
+                    cache_similarity=hit.similarity
+                )
+        
         # Prepare Bedrock request
         body = {
             "anthropic_version": "bedrock-2023-05-31",
@@ -98,8 +195,7 @@ async def generate_text(request: GenerateRequest):
         latency_ms = (end_time - start_time) * 1000
         
         # Estimate tokens and cost (Claude Sonnet pricing)
-        input_tokens = len(request.prompt.split()) * 1.3  # Rough estimation
-        output_tokens = len(generated_text.split()) * 1.3
+        input_tokens, output_tokens = estimate_tokens(request.prompt, generated_text)
         total_tokens = int(input_tokens + output_tokens)
         
         # Claude 3.5 Sonnet pricing (per 1M tokens)
@@ -145,6 +241,26 @@ async def generate_text(request: GenerateRequest):
             ]
         )
         
+        if semantic_cache is not None:
+            semantic_cache.put(cache_scope(request), request.prompt, generated_text)
+            stats = semantic_cache.stats()
+            statsd.gauge(
+                "bedrock.cache.entries",
+                stats["entries"],
+                tags=[
+                    f"model:{BEDROCK_MODEL_ID}",
+                    f"service:{SERVICE_NAME}"
+                ]
+            )
+            statsd.gauge(
+                "bedrock.cache.bytes_used",
+                stats["bytes_used"],
+                tags=[
+                    f"model:{BEDROCK_MODEL_ID}",
+                    f"service:{SERVICE_NAME}"
+                ]
+            )
+        
         logger.info(
             "generate_request_completed",
             user_id=request.user_id,
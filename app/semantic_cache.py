@@ -0,0 +1,214 @@
+"""Near-duplicate prompt cache keyed by locally computed shingle sets.
+
+Prompts are normalized (case, whitespace, trailing sentence punctuation) and
+reduced to a set of hashed shingles: their tokens and adjacent token pairs.
+Two prompts match when the Jaccard similarity of their shingle sets reaches the
+threshold; that score is what a hit reports.
+
+Candidates come from a prefix-filter index. Shingles are put in one global
+order (pairs before single tokens, then by hash) and each entry is indexed
+under its first ``n - ceil(threshold * n) + 1`` shingles only. Any two sets
+with Jaccard similarity >= threshold must share one of those prefix shingles,
+so lookups probe a few short buckets and never miss a qualifying entry.
+"""
+import hashlib
+import math
+import re
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+
+
+# Bookkeeping cost charged against the memory cap on top of the cached
+# response and shingle array objects: a fixed part per entry (entry object,
+# LRU slot and scope), one list slot per indexed prefix shingle, and one dict
+# slot and list per bucket while it exists. Fitted to RSS growth at
+# thresholds 0.8 and 0.95, where nearly every prefix shingle gets a bucket of
+# its own; benchmarks/semantic_cache_bench.py reports both for comparison.
+ENTRY_OVERHEAD_BYTES = 480
+INDEX_SLOT_BYTES = 8
+BUCKET_OVERHEAD_BYTES = 160
+
+# Words and runs of symbols are both tokens, so "C++" and "C#" stay distinct.
+# Sentence punctuation is only dropped from the end of a symbol run.
+_TOKEN = re.compile(r"(\w+)|([^\w\s]+)")
+_SENTENCE_PUNCTUATION = ".,;:!?"
+
+
+def tokenize(prompt: str) -> List[str]:
+    tokens = []
+    for word, symbols in _TOKEN.findall(prompt.lower()):
+        token = word or symbols.rstrip(_SENTENCE_PUNCTUATION)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def normalize_prompt(prompt: str) -> str:
+    return " ".join(tokenize(prompt))
+
+
+def _hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shingles(prompt: str) -> array:
+    """Hashed token pairs and tokens of ``prompt``, deduplicated, in index order."""
+    tokens = tokenize(prompt)
+    pairs = {_hash(f"{a} {b}") for a, b in zip(tokens, tokens[1:])}
+    singles = {_hash(token) for token in tokens} - pairs
+    # Pairs are far rarer than single words, so putting them first keeps
+    # common words like "the" out of the indexed prefixes
+    return array("Q", sorted(pairs) + sorted(singles))
+
+
+def jaccard(a: Set[int], b: array) -> float:
+    overlap = sum(1 for shingle in b if shingle in a)
+    return overlap / (len(a) + len(b) - overlap)
+
+
+def similarity(a: str, b: str) -> float:
+    return jaccard(set(shingles(a)), shingles(b))
+
+
+class CacheHit(NamedTuple):
+    value: str
+    similarity: float
+
+
+class _Entry:
+    __slots__ = ("scope", "shingles", "value", "size_bytes")
+
+    def __init__(self, scope: Hashable, shingles: array, value: str, size_bytes: int):
+        self.scope = scope
+        self.shingles = shingles
+        self.value = value
+        self.size_bytes = size_bytes
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = 0.95, max_bytes: int = 64 * 1024 * 1024):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        # scope -> prefix shingle -> ids of entries indexed under it
+        self._buckets: Dict[Hashable, Dict[int, List[int]]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _prefix(self, shingles: array) -> array:
+        size = len(shingles)
+        return shingles[:size - math.ceil(self.threshold * size - 1e-9) + 1]
+
+    def _best_match(self, scope: Hashable, shingles: array) -> Tuple[Optional[int], float]:
+        best_id, best_score = None, 0.0
+        buckets = self._buckets.get(scope)
+        if buckets is None:
+            return best_id, best_score
+
+        query = set(shingles)
+        # Sets of very different sizes cannot reach the threshold
+        min_size = self.threshold * len(query) - 1e-9
+        max_size = len(query) / self.threshold + 1e-9
+        seen: Set[int] = set()
+        for key in self._prefix(shingles):
+            for entry_id in buckets.get(key, ()):
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                candidate = self._entries[entry_id].shingles
+                if not min_size <= len(candidate) <= max_size:
+                    continue
+                score = jaccard(query, candidate)
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+                    if score == 1.0:
+                        return best_id, best_score
+        return best_id, best_score
+
+    def get(self, scope: Hashable, prompt: str) -> Optional[CacheHit]:
+        prompt_shingles = shingles(prompt)
+        with self._lock:
+            # Prompts without tokens carry no meaning to compare; never match them
+            entry_id, score = self._best_match(scope, prompt_shingles) if prompt_shingles else (None, 0.0)
+            if entry_id is None or score < self.threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            return CacheHit(value=self._entries[entry_id].value, similarity=score)
+
+    def put(self, scope: Hashable, prompt: str, value: str) -> None:
+        prompt_shingles = shingles(prompt)
+        if not prompt_shingles:
+            return
+
+        prefix = self._prefix(prompt_shingles)
+        size_bytes = (
+            sys.getsizeof(value)
+            + sys.getsizeof(prompt_shingles)
+            + ENTRY_OVERHEAD_BYTES
+            + INDEX_SLOT_BYTES * len(prefix)
+        )
+        if size_bytes > self.max_bytes:
+            return
+
+        with self._lock:
+            entry_id, score = self._best_match(scope, prompt_shingles)
+            if entry_id is not None and score == 1.0:
+                self._remove(entry_id)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(scope, prompt_shingles, value, size_bytes)
+            buckets = self._buckets.setdefault(scope, {})
+            for key in prefix:
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = []
+                    self.bytes_used += BUCKET_OVERHEAD_BYTES
+                bucket.append(entry_id)
+            self.bytes_used += size_bytes
+
+            while self.bytes_used > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        buckets = self._buckets[entry.scope]
+        for key in self._prefix(entry.shingles):
+            bucket = buckets[key]
+            bucket.remove(entry_id)
+            if not bucket:
+                del buckets[key]
+                self.bytes_used -= BUCKET_OVERHEAD_BYTES
+        if not buckets:
+            del self._buckets[entry.scope]
+        self.bytes_used -= entry.size_bytes
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
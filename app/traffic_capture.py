@@ -0,0 +1,134 @@
+"""Sampled capture of /generate traffic for offline replay.
+
+Each sampled request is written as one compact JSON line to a size-rotated
+log: arrival timestamp, request/response sizes, status and latency, plus the
+prompt (or only its size when prompts are redacted). Lines are queued from the
+request path and written, flushed and rotated by a background listener thread,
+so disk I/O never runs on the event loop.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from typing import Any, Dict, Iterable
+
+
+class TrafficCapture:
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 1.0,
+        redact_prompts: bool = False,
+        max_bytes: int = 16 * 1024 * 1024,
+        backup_count: int = 5
+    ):
+        self.sample_rate = sample_rate
+        self.redact_prompts = redact_prompts
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(records, file_handler)
+        self._queue_handler = logging.handlers.QueueHandler(records)
+        self._queue_handler.listener = self._listener
+
+        self._logger = logging.getLogger(f"genai_guardian.traffic_capture.{path}")
+        for handler in list(self._logger.handlers):
+            _close_handler(handler)
+            self._logger.removeHandler(handler)
+        self._logger.addHandler(self._queue_handler)
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._listener.start()
+
+    def close(self) -> None:
+        """Write out queued records and close the capture file."""
+        if self._queue_handler in self._logger.handlers:
+            self._logger.removeHandler(self._queue_handler)
+            _close_handler(self._queue_handler)
+
+    def should_sample(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, arrival: float, body: bytes, status: int, latency_ms: float, response_bytes: int) -> None:
+        entry: Dict[str, Any] = {
+            "ts": round(arrival, 6),
+            "status": status,
+            "latency_ms": round(latency_ms, 3),
+            "request_bytes": len(body),
+            "response_bytes": response_bytes
+        }
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            payload = {}
+        if isinstance(payload, dict):
+            prompt = payload.get("prompt")
+            if isinstance(prompt, str):
+                entry["prompt_chars"] = len(prompt)
+                entry["prompt_words"] = len(prompt.split())
+                if not self.redact_prompts:
+                    entry["prompt"] = prompt
+            for field in ("user_id", "max_tokens"):
+                if field in payload:
+                    entry[field] = payload[field]
+
+        self._logger.info(json.dumps(entry, separators=(",", ":")))
+
+
+def _close_handler(handler: logging.Handler) -> None:
+    # A QueueHandler replaced on the shared logger still owns a running
+    # listener and an open capture file; stop and close both
+    listener = getattr(handler, "listener", None)
+    if listener is not None:
+        listener.stop()
+        for target in listener.handlers:
+            target.close()
+    handler.close()
+
+
+class TrafficCaptureMiddleware:
+    """ASGI middleware feeding sampled requests on ``paths`` into a TrafficCapture."""
+
+    def __init__(self, app, capture: TrafficCapture, paths: Iterable[str] = ("/generate",)):
+        self.app = app
+        self.capture = capture
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths or not self.capture.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        arrival = time.time()
+        start = time.perf_counter()
+        body = bytearray()
+        status = 500
+        response_bytes = 0
+
+        async def capture_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                body.extend(message.get("body", b""))
+            return message
+
+        async def capture_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            self.capture.record(arrival, bytes(body), status, (time.perf_counter() - start) * 1000, response_bytes)
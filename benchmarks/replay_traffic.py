@@ -0,0 +1,210 @@
+"""Replay captured /generate traffic and report latency percentiles and errors.
+
+Captures are written by the app when TRAFFIC_CAPTURE_ENABLED=true. Requests
+are sent open-loop at their recorded inter-arrival offsets divided by --speed,
+and latency is measured from each request's scheduled send time, so time spent
+waiting for one of the --concurrency workers is reported rather than hidden.
+
+--speed max drops the schedule and runs closed-loop: --concurrency workers send
+the requests back to back in arrival order, and latency is measured from when a
+worker starts each request. The report's "latency_from" field records which.
+
+Usage:
+    python benchmarks/replay_traffic.py /tmp/genai-guardian/capture.jsonl* --app-url "$APP_URL" --speed 10
+    python benchmarks/replay_traffic.py capture.jsonl --fake-bedrock --fake-latency-ms 400 --speed 1
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import random
+import socket
+import string
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+
+def load_capture(patterns: List[str]) -> List[Dict[str, Any]]:
+    records = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            with open(path) as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+    # Lines are written on completion, so restore arrival order
+    return sorted(records, key=lambda record: record["ts"])
+
+
+def synthesize_prompt(words: int, chars: int, rng: random.Random) -> str:
+    if words <= 0:
+        return " " * chars
+    letters = max(chars - (words - 1), words)
+    lengths = [letters // words + (1 if i < letters % words else 0) for i in range(words)]
+    return " ".join("".join(rng.choice(string.ascii_lowercase) for _ in range(length)) for length in lengths)
+
+
+def build_payload(record: Dict[str, Any], index: int) -> Dict[str, Any]:
+    # Only fields present in the captured request are sent, so requests that
+    # originally failed validation (no prompt, no user_id) fail it again
+    payload: Dict[str, Any] = {}
+    if "prompt" in record:
+        payload["prompt"] = record["prompt"]
+    elif "prompt_chars" in record:
+        # Redacted capture: synthesize a distinct prompt of the recorded size so
+        # replays are not collapsed into cache hits on the target
+        rng = random.Random(f"{index}:{record['ts']}")
+        payload["prompt"] = synthesize_prompt(record["prompt_words"], record["prompt_chars"], rng)
+    for field in ("user_id", "max_tokens"):
+        if field in record:
+            payload[field] = record[field]
+    return payload
+
+
+class FakeBedrock:
+    """Stand-in for the bedrock-runtime client that answers after a fixed delay."""
+
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+
+    def invoke_model(self, modelId: str, body: str, contentType: str) -> Dict[str, Any]:
+        request = json.loads(body)
+        time.sleep(self.latency_ms / 1000)
+        text = " ".join(["ok"] * min(request["max_tokens"], 100))
+        return {"body": io.BytesIO(json.dumps({"content": [{"type": "text", "text": text}]}).encode())}
+
+
+def start_fake_app(latency_ms: float) -> str:
+    import uvicorn
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    from app import main
+
+    main.bedrock = FakeBedrock(latency_ms)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def send(app_url: str, payload: Dict[str, Any], timeout: float, scheduled: Optional[float]) -> Tuple[float, float, str]:
+    started = time.perf_counter()
+    # Without a schedule (closed loop) there is no intended send time to honour
+    origin = started if scheduled is None else scheduled
+    try:
+        response = requests.post(f"{app_url}/generate", json=payload, timeout=timeout)
+        outcome = str(response.status_code)
+    except requests.RequestException as e:
+        outcome = type(e).__name__
+    finished = time.perf_counter()
+    return (finished - origin) * 1000, (started - origin) * 1000, outcome
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "mean": round(statistics.mean(samples), 2),
+        "p50": round(percentile(samples, 50), 2),
+        "p90": round(percentile(samples, 90), 2),
+        "p95": round(percentile(samples, 95), 2),
+        "p99": round(percentile(samples, 99), 2),
+        "max": round(max(samples), 2)
+    }
+
+
+def replay(records: List[Dict[str, Any]], app_url: str, speed: float, concurrency: int, timeout: float) -> Dict[str, Any]:
+    first_ts = records[0]["ts"]
+    payloads = [build_payload(record, index) for index, record in enumerate(records)]
+    futures = []
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record, payload in zip(records, payloads):
+            scheduled = None
+            if speed > 0:
+                scheduled = start + (record["ts"] - first_ts) / speed
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(pool.submit(send, app_url, payload, timeout, scheduled))
+        results = [future.result() for future in futures]
+    duration_s = time.perf_counter() - start
+
+    latencies = [latency for latency, _, outcome in results if outcome.startswith("2")]
+    outcomes = Counter(outcome for _, _, outcome in results)
+    report: Dict[str, Any] = {
+        "app_url": app_url,
+        "speed": speed or "max",
+        "requests": len(results),
+        "duration_s": round(duration_s, 3),
+        "throughput_rps": round(len(results) / duration_s, 2) if duration_s else 0.0,
+        "success": len(latencies),
+        "errors": {outcome: count for outcome, count in outcomes.items() if not outcome.startswith("2")},
+        "captured_span_s": round(records[-1]["ts"] - first_ts, 3),
+        "latency_from": "scheduled_send" if speed > 0 else "request_start"
+    }
+    if speed > 0:
+        # Time between the scheduled send and a worker starting the request
+        report["send_delay_ms"] = summarize([delay for _, delay, _ in results])
+    if latencies:
+        report["latency_ms"] = summarize(latencies)
+    return report
+
+
+def parse_speed(value: str) -> float:
+    if value == "max":
+        return 0.0
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", nargs="+", help="capture files or globs (rotated files are merged)")
+    parser.add_argument("--app-url", default=os.getenv("APP_URL"))
+    parser.add_argument("--fake-bedrock", action="store_true", help="replay against a local app with a fake Bedrock client")
+    parser.add_argument("--fake-latency-ms", type=float, default=0.0)
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="time scale, e.g. 1, 10 or max")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--report", help="also write the JSON report to this path")
+    args = parser.parse_args()
+
+    records = load_capture(args.capture)
+    if not records:
+        parser.error("capture is empty")
+
+    if args.fake_bedrock:
+        app_url = start_fake_app(args.fake_latency_ms)
+    elif args.app_url:
+        app_url = args.app_url.rstrip("/")
+    else:
+        parser.error("set --app-url, APP_URL or --fake-bedrock")
+
+    report = replay(records, app_url, args.speed, args.concurrency, args.timeout)
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
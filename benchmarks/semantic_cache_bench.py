@@ -0,0 +1,124 @@
+"""Lookup latency and memory benchmark for the near-duplicate semantic cache.
+
+Lookups are split evenly between reformatted copies of cached prompts (exact
+after normalization), reworded copies (one word swapped or dropped, so
+candidates have to be verified rather than matched exactly) and unseen prompts.
+
+Usage:
+    python benchmarks/semantic_cache_bench.py --entries 1000000 --lookups 30000
+"""
+import argparse
+import math
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.semantic_cache import SemanticCache  # noqa: E402
+
+
+WORDS = [f"w{i}" for i in range(20000)]
+
+
+def make_prompt(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 24)))
+
+
+def reword(rng: random.Random, prompt: str) -> str:
+    words = prompt.split()
+    index = rng.randrange(len(words))
+    if rng.random() < 0.5:
+        words[index] = rng.choice(WORDS)
+    else:
+        del words[index]
+    return " ".join(words)
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is in KiB on Linux; close enough while the cache only grows
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=30_000)
+    parser.add_argument("--threshold", type=float, default=0.95)
+    parser.add_argument("--value-bytes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cache = SemanticCache(threshold=args.threshold, max_bytes=1 << 40)
+    scope = ("benchmark-model", 1000, "tenant_0")
+
+    prompts = [make_prompt(rng) for _ in range(args.entries)]
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    for i, prompt in enumerate(prompts):
+        # Like app.main, every request builds its own scope tuple and strings
+        cache.put(("benchmark-model", int("1000"), "tenant_" + str(i % 1)), prompt, f"{i:0{args.value_bytes}d}")
+    populate_s = time.perf_counter() - start
+    rss_growth = rss_bytes() - rss_before
+
+    stats = cache.stats()
+    print(f"populated {args.entries} entries in {populate_s:.1f}s")
+    print(
+        f"memory: accounted={stats['bytes_used'] / stats['entries']:.0f} B/entry "
+        f"rss_growth={rss_growth / stats['entries']:.0f} B/entry "
+        f"({rss_growth / 2 ** 20:.0f} MiB)"
+    )
+
+    kinds = ("reformatted", "reworded", "new")
+    queries = []
+    for i in range(args.lookups):
+        kind = kinds[i % len(kinds)]
+        if kind == "reformatted":
+            queries.append((kind, "  " + rng.choice(prompts).upper() + "?!"))
+        elif kind == "reworded":
+            queries.append((kind, reword(rng, rng.choice(prompts))))
+        else:
+            queries.append((kind, make_prompt(rng)))
+
+    latencies_us = defaultdict(list)
+    hits = Counter()
+    scores = Counter()
+    for kind, query in queries:
+        start = time.perf_counter()
+        hit = cache.get(scope, query)
+        latencies_us[kind].append((time.perf_counter() - start) * 1_000_000)
+        if hit is not None:
+            hits[kind] += 1
+            scores[math.floor(hit.similarity * 100) / 100] += 1
+
+    for kind in kinds:
+        samples = latencies_us[kind]
+        print(
+            f"{kind:>11}: hit_rate={hits[kind] / len(samples):.3f} lookup us "
+            f"mean={statistics.mean(samples):.1f} "
+            f"p50={percentile(samples, 50):.1f} "
+            f"p95={percentile(samples, 95):.1f} "
+            f"p99={percentile(samples, 99):.1f}"
+        )
+
+    print("hit similarity: " + " ".join(
+        f"{score:.2f}={count}" for score, count in sorted(scores.items(), reverse=True)
+    ))
+
+
+if __name__ == "__main__":
+    main()
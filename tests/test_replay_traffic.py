@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from app.traffic_capture import TrafficCapture
+from benchmarks import replay_traffic
+
+
+def test_load_capture_merges_rotated_files(tmp_path):
+    """Test that rotated capture files are merged back into arrival order."""
+    path = tmp_path / "capture.jsonl"
+    capture = TrafficCapture(str(path), max_bytes=200, backup_count=10)
+    body = json.dumps({"prompt": "Hello there", "user_id": "user_1"}).encode()
+    for arrival in (3.0, 1.0, 5.0, 2.0, 6.0, 4.0):
+        capture.record(arrival, body, 200, 10.0, 50)
+    capture.close()
+
+    assert (tmp_path / "capture.jsonl.1").exists()
+    records = replay_traffic.load_capture([f"{path}*"])
+
+    assert [record["ts"] for record in records] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+
+
+def test_build_payload_synthesizes_redacted_prompts():
+    """Test that redacted records replay as distinct prompts of the recorded size."""
+    record = {"ts": 1.0, "prompt_chars": 30, "prompt_words": 5, "user_id": "user_1", "max_tokens": 50}
+
+    prompts = {replay_traffic.build_payload(record, index)["prompt"] for index in range(20)}
+
+    assert len(prompts) == 20
+    for prompt in prompts:
+        assert len(prompt) == 30
+        assert len(prompt.split()) == 5
+    assert replay_traffic.build_payload(record, 3) == replay_traffic.build_payload(record, 3)
+
+
+def test_build_payload_keeps_captured_prompt():
+    """Test that unredacted records replay their captured prompt."""
+    record = {"ts": 1.0, "prompt": "Hello there", "user_id": "user_1", "max_tokens": 50}
+
+    assert replay_traffic.build_payload(record, 0) == {"prompt": "Hello there", "user_id": "user_1", "max_tokens": 50}
+
+
+def test_build_payload_keeps_invalid_requests_invalid():
+    """Test that captured requests without a prompt or user_id are not filled in."""
+    record = {"ts": 1.0, "status": 422, "max_tokens": 50}
+
+    assert replay_traffic.build_payload(record, 0) == {"max_tokens": 50}
+
+
+def test_send_measures_from_schedule_only_when_scheduled(monkeypatch):
+    """Test that open-loop latency includes waiting since the scheduled time."""
+    class Response:
+        status_code = 200
+
+    monkeypatch.setattr(replay_traffic.requests, "post", lambda *args, **kwargs: Response())
+    scheduled = replay_traffic.time.perf_counter() - 0.5
+
+    latency_ms, delay_ms, outcome = replay_traffic.send("http://fake", {}, 1, scheduled)
+    assert outcome == "200"
+    assert latency_ms >= 500
+    assert delay_ms >= 500
+
+    latency_ms, delay_ms, _ = replay_traffic.send("http://fake", {}, 1, None)
+    assert latency_ms < 500
+    assert delay_ms == 0
+
+
+@pytest.fixture
+def stub_send(monkeypatch):
+    calls = []
+
+    def send(app_url, payload, timeout, scheduled):
+        calls.append(scheduled)
+        outcome = "503" if payload["user_id"] == "failing" else "200"
+        return 5.0, 0.0, outcome
+
+    monkeypatch.setattr(replay_traffic, "send", send)
+    return calls
+
+
+def test_replay_scales_inter_arrival_offsets(stub_send):
+    """Test that recorded offsets are divided by the speed factor."""
+    records = [
+        {"ts": 100.0, "prompt": "a", "user_id": "user_1"},
+        {"ts": 100.5, "prompt": "b", "user_id": "failing"},
+        {"ts": 101.0, "prompt": "c", "user_id": "user_1"},
+    ]
+
+    report = replay_traffic.replay(records, "http://fake", speed=10, concurrency=4, timeout=1)
+
+    offsets = [scheduled - stub_send[0] for scheduled in stub_send]
+    assert offsets == pytest.approx([0.0, 0.05, 0.1])
+    assert report["requests"] == 3
+    assert report["success"] == 2
+    assert report["errors"] == {"503": 1}
+    assert report["latency_ms"]["p50"] == 5.0
+    assert report["latency_from"] == "scheduled_send"
+
+
+def test_replay_max_speed_ignores_offsets(stub_send):
+    """Test that --speed max runs closed-loop without a send schedule."""
+    records = [{"ts": float(ts), "prompt": "a", "user_id": "user_1"} for ts in (0, 60, 120)]
+
+    report = replay_traffic.replay(records, "http://fake", speed=0.0, concurrency=4, timeout=1)
+
+    assert stub_send == [None, None, None]
+    assert report["speed"] == "max"
+    assert report["latency_from"] == "request_start"
+    assert "send_delay_ms" not in report
@@ -0,0 +1,166 @@
+import random
+
+import pytest
+
+from app.semantic_cache import SemanticCache, jaccard, normalize_prompt, shingles, similarity
+
+
+SCOPE = ("test-model", 100, "user_1")
+
+
+def test_normalize_prompt():
+    """Test that casing, punctuation and whitespace are normalized away."""
+    assert normalize_prompt("  What is   Bedrock?!\n") == "what is bedrock"
+
+
+def test_reformatted_prompt_hits():
+    """Test that a prompt differing only in formatting is served from cache."""
+    cache = SemanticCache(threshold=0.95)
+    cache.put(SCOPE, "How do I reset my password?", "Click 'Forgot password'.")
+
+    hit = cache.get(SCOPE, "how do i   RESET my password")
+
+    assert hit is not None
+    assert hit.value == "Click 'Forgot password'."
+    assert hit.similarity == 1.0
+
+
+def test_unrelated_prompt_misses():
+    """Test that an unrelated prompt is not served from cache."""
+    cache = SemanticCache(threshold=0.95)
+    cache.put(SCOPE, "How do I reset my password?", "Click 'Forgot password'.")
+
+    assert cache.get(SCOPE, "What are your opening hours on weekends?") is None
+
+
+def test_one_token_change_hits_long_prompts_only():
+    """Test that one changed token is tolerated in a long prompt but not a short one."""
+    words = [f"term{i}" for i in range(30)]
+    long_prompt = " ".join(words)
+    reworded = " ".join(words[:15] + ["other"] + words[16:])
+    cache = SemanticCache(threshold=0.9)
+    cache.put(SCOPE, long_prompt, "long answer")
+    cache.put(SCOPE, "How do I reset my password?", "short answer")
+
+    # 29 of 31 tokens and 27 of 31 token pairs are shared
+    hit = cache.get(SCOPE, reworded)
+    assert hit is not None
+    assert hit.value == "long answer"
+    assert hit.similarity == 56 / 62
+
+    # 5 of 7 tokens and 3 of 7 token pairs are shared
+    assert similarity("How do I reset my password?", "How can I reset my password?") == 8 / 14
+    assert cache.get(SCOPE, "How can I reset my password?") is None
+
+
+def test_word_order_matters():
+    """Test that reordered words are not treated as the same prompt."""
+    cache = SemanticCache(threshold=0.5)
+    cache.put(SCOPE, "dog bites man", "news")
+
+    assert cache.get(SCOPE, "man bites dog") is None
+
+
+def test_best_candidate_is_returned():
+    """Test that the most similar cached prompt wins over other candidates."""
+    words = [f"term{i}" for i in range(40)]
+    cache = SemanticCache(threshold=0.8)
+    cache.put(SCOPE, " ".join(words[:-2]), "shorter")
+    cache.put(SCOPE, " ".join(words[:-1]), "closest")
+
+    hit = cache.get(SCOPE, " ".join(words))
+
+    assert hit.value == "closest"
+    assert hit.similarity == similarity(" ".join(words[:-1]), " ".join(words))
+
+
+def test_promptless_inputs_are_not_cached():
+    """Test that prompts without any tokens never store or serve an answer."""
+    cache = SemanticCache()
+    cache.put(SCOPE, "???", "answer to nothing")
+
+    assert cache.get(SCOPE, "???") is None
+    assert cache.get(SCOPE, "!!!") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_symbols_are_tokens():
+    """Test that symbol runs distinguish prompts while trailing punctuation does not."""
+    cache = SemanticCache()
+    cache.put(SCOPE, "C++", "about C++")
+    cache.put(SCOPE, "\U0001F600", "grinning")
+
+    assert cache.get(SCOPE, "C#") is None
+    assert cache.get(SCOPE, "\U0001F622") is None
+    assert cache.get(SCOPE, "c++?").value == "about C++"
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.95])
+def test_index_never_misses_a_qualifying_entry(threshold):
+    """Test that indexed lookups agree with a brute-force similarity scan."""
+    rng = random.Random(7)
+    vocabulary = [f"w{i}" for i in range(12)]
+    prompts = [" ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 10))) for _ in range(200)]
+    cache = SemanticCache(threshold=threshold)
+    for prompt in prompts:
+        cache.put(SCOPE, prompt, prompt)
+
+    cached = [shingles(prompt) for prompt in prompts]
+
+    for _ in range(200):
+        query = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 10)))
+        query_shingles = set(shingles(query))
+        best = max(jaccard(query_shingles, candidate) for candidate in cached)
+        hit = cache.get(SCOPE, query)
+        if best >= threshold:
+            assert hit is not None
+            assert hit.similarity == best
+        else:
+            assert hit is None
+
+
+def test_scopes_are_isolated():
+    """Test that entries from one model/tenant scope never serve another."""
+    cache = SemanticCache()
+    cache.put(SCOPE, "Hello there", "cached")
+
+    assert cache.get(("test-model", 100, "user_2"), "Hello there") is None
+    assert cache.get(("other-model", 100, "user_1"), "Hello there") is None
+
+
+def test_memory_cap_evicts_least_recently_used():
+    """Test that the memory cap evicts the least recently used entry."""
+    sizing = SemanticCache()
+    sizing.put(SCOPE, "first prompt", "a")
+    cache = SemanticCache(max_bytes=2 * sizing.stats()["bytes_used"])
+    cache.put(SCOPE, "first prompt", "a")
+    cache.put(SCOPE, "second prompt", "b")
+    assert cache.get(SCOPE, "first prompt") is not None
+
+    cache.put(SCOPE, "third prompt", "c")
+
+    assert cache.get(SCOPE, "second prompt") is None
+    assert cache.get(SCOPE, "first prompt") is not None
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["bytes_used"] <= stats["max_bytes"]
+
+
+def test_stats_hit_rate():
+    """Test that hits and misses are counted into the hit rate."""
+    cache = SemanticCache()
+    cache.put(SCOPE, "Hello there", "cached")
+    cache.get(SCOPE, "hello there")
+    cache.get(SCOPE, "something else entirely")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_invalid_threshold():
+    """Test that out-of-range thresholds are rejected."""
+    with pytest.raises(ValueError):
+        SemanticCache(threshold=0.0)
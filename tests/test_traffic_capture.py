@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+from app.traffic_capture import TrafficCapture, TrafficCaptureMiddleware
+
+
+async def echo_app(scope, receive, send):
+    message = await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": message["body"]})
+
+
+def call(middleware, path, body):
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware({"type": "http", "path": path}, receive, send))
+    return sent
+
+
+def read_capture(*captures, path):
+    # Records are written by the listener thread; closing flushes them
+    for capture in captures:
+        capture.close()
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_generate_request_is_captured(tmp_path):
+    """Test that a /generate request is written with timing, sizes and prompt."""
+    path = tmp_path / "capture.jsonl"
+    capture = TrafficCapture(str(path))
+    middleware = TrafficCaptureMiddleware(echo_app, capture)
+    body = json.dumps({"prompt": "Hello there", "user_id": "user_1", "max_tokens": 50}).encode()
+
+    sent = call(middleware, "/generate", body)
+
+    assert sent[0]["status"] == 200
+    [entry] = read_capture(capture, path=path)
+    assert entry["status"] == 200
+    assert entry["request_bytes"] == len(body)
+    assert entry["response_bytes"] == len(body)
+    assert entry["latency_ms"] >= 0
+    assert entry["ts"] > 0
+    assert entry["prompt"] == "Hello there"
+    assert entry["prompt_words"] == 2
+    assert entry["user_id"] == "user_1"
+    assert entry["max_tokens"] == 50
+
+
+def test_prompts_are_redacted(tmp_path):
+    """Test that redaction keeps the prompt size but drops its text."""
+    path = tmp_path / "capture.jsonl"
+    capture = TrafficCapture(str(path), redact_prompts=True)
+    middleware = TrafficCaptureMiddleware(echo_app, capture)
+
+    call(middleware, "/generate", json.dumps({"prompt": "secret words", "user_id": "user_1"}).encode())
+
+    [entry] = read_capture(capture, path=path)
+    assert "prompt" not in entry
+    assert entry["prompt_chars"] == len("secret words")
+    assert "secret" not in path.read_text()
+
+
+def test_other_paths_and_unsampled_requests_are_skipped(tmp_path):
+    """Test that only sampled requests on captured paths are written."""
+    path = tmp_path / "capture.jsonl"
+    every = TrafficCapture(str(path))
+    call(TrafficCaptureMiddleware(echo_app, every), "/health", b"")
+    every.close()
+    none = TrafficCapture(str(path), sample_rate=0.0)
+    call(TrafficCaptureMiddleware(echo_app, none), "/generate", b"{}")
+
+    assert read_capture(none, path=path) == []
+
+
+def test_recreating_a_capture_closes_the_previous_file(tmp_path):
+    """Test that a new capture on the same path stops the old writer thread and file."""
+    path = tmp_path / "capture.jsonl"
+    first = TrafficCapture(str(path))
+    first.record(1.0, b"{}", 200, 1.0, 2)
+    [file_handler] = first._listener.handlers
+
+    second = TrafficCapture(str(path))
+    second.record(2.0, b"{}", 200, 1.0, 2)
+
+    assert file_handler.stream is None
+    assert [entry["ts"] for entry in read_capture(second, path=path)] == [1.0, 2.0]